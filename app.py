@@ -1,116 +1,197 @@
+import io
+
 import streamlit as st
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
 
 st.set_page_config(page_title="Delivery Scheduling using Z-Transforms", layout="wide")
 
 st.title("🚚 Delivery Scheduling Analysis Using Z-Transforms")
 st.write("A web application to analyze regular and delayed delivery schedules using discrete-time models.")
 
+# Only the first rows of an uploaded dataset are ever used as a sequence
+_MAX_ROWS = 200
+
+# Render with Matplotlib instead of Streamlit's native browser-side charts
+USE_MPL = False
+
 menu = ["Introduction", "Regular Delivery Model", "Delayed Delivery Model", "Real Data Demo"]
 choice = st.sidebar.selectbox("Select Section", menu)
 
 # -------------------------
 # Helper: build sequences
 # -------------------------
+_PULSE_TILE = np.tile(np.array([1, 0, 0], dtype=np.int8), 40)  # covers N up to 120 without retile
+
+@st.cache_data(max_entries=32)
 def build_sequence(N, pattern):
     n = np.arange(N)
     if pattern == "Constant (x[n]=1)":
-        x = np.ones(N)
+        # Read-only view; nothing downstream mutates x
+        x = np.broadcast_to(np.int8(1), (N,))
     else:
         # Pulse/Periodic pattern: 1 every 3 steps -> 1,0,0,1,0,0,...
-        x = np.zeros(N)
-        x[::3] = 1
+        if N <= _PULSE_TILE.size:
+            x = _PULSE_TILE[:N].copy()
+        else:
+            x = np.tile(np.array([1, 0, 0], dtype=np.int8), (N + 2) // 3)[:N]
     return n, x
 
+def _delayed_sequence(N, pattern, k):
+    n, x = build_sequence(N, pattern)
+
+    # Build delayed sequence y[n] = x[n-k]
+    if pattern == "Constant (x[n]=1)":
+        y = np.concatenate((np.zeros(min(k, N), dtype=np.int8), np.ones(max(N-k, 0), dtype=np.int8)))
+    else:
+        y = np.pad(x[:max(N-k, 0)], (min(k, N), 0))
+    return n, x, y
+
+def _real_sequence(df, col, k):
+    N = min(len(df), _MAX_ROWS)
+    x = df[col].iloc[:N].to_numpy(copy=False, dtype=np.float64)
+
+    y = np.pad(x[:max(N-k, 0)], (min(k, N), 0))
+
+    n = np.arange(N)
+    return n, x, y
+
+# Keyed on the upload's file_id; the leading underscore keeps Streamlit from
+# hashing the file contents on every rerun
+@st.cache_data(max_entries=8, show_spinner=False)
+def _parse_csv(file_id, _f, max_rows):
+    import pandas as pd
+
+    _f.seek(0)
+    return pd.read_csv(_f, nrows=max_rows, engine="c")
+
 # -------------------------
-# Introduction
+# Helper: build figures
 # -------------------------
-if choice == "Introduction":
-    st.header("Introduction")
-    st.write("""
-    This app models delivery schedules as discrete-time sequences and shows how delays affect them.
-    You can view a regular (on-time) schedule and a delayed schedule, and visualize the effect of delay.
-    """)
+# One Figure per plot kind per session; Matplotlib artists are not thread-safe
+def _get_axes(kind):
+    key = f"_axes_{kind}"
+    if key not in st.session_state:
+        # Figure (not pyplot) skips the global figure registry and renders with Agg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(10, 4))
+        fig.set_layout_engine(None)
+        st.session_state[key] = (fig, fig.subplots())
+    return st.session_state[key]
+
+# Fixed limits and a capped tick count for the 0/1 delivery plots
+def _setup_delivery_axes(ax, N):
+    from matplotlib.ticker import MaxNLocator
+
+    ax.set_autoscale_on(False)
+    ax.set_xlim(-0.5, N - 0.5)
+    ax.set_ylim(-0.2, 1.2)
+    ax.xaxis.set_major_locator(MaxNLocator(10))
+
+def _make_regular_fig(N, pattern):
+    n, x = build_sequence(N, pattern)
+
+    fig, ax = _get_axes("regular")
+    ax.cla()
+    _setup_delivery_axes(ax, N)
+    ax.plot(n, x, drawstyle="steps-mid", marker="o", label="x[n] (Original)", linewidth=2)
+    ax.set_xlabel("n (time steps)")
+    ax.set_ylabel("Deliveries")
+    ax.set_title("Regular Delivery Sequence")
+    ax.grid(True, linestyle="--", alpha=0.5)
+    ax.legend()
+    return fig
+
+def _make_delayed_fig(N, pattern, k):
+    n, x, y = _delayed_sequence(N, pattern, k)
+
+    fig, ax = _get_axes("delayed")
+    ax.cla()
+    _setup_delivery_axes(ax, N)
+    ax.plot(n, x, drawstyle="steps-mid", marker="o", label="x[n] (Original)", linewidth=2)
+
+    ax.plot(n, y, drawstyle="steps-mid", marker="o", label="y[n] (Delayed)", linewidth=2)
+
+    ax.set_xlabel("n (time steps)")
+    ax.set_ylabel("Deliveries")
+    ax.set_title("Original vs Delayed Delivery Sequence")
+    ax.grid(True, linestyle="--", alpha=0.5)
+    ax.legend()
+    return fig
+
+def _make_real_fig(df, col, k):
+    n, x, y = _real_sequence(df, col, k)
+
+    fig, ax = _get_axes("real")
+    ax.cla()
+    ax.plot(n, x, label="Original Sequence", linewidth=2)
+    ax.plot(n, y, label="Delayed Sequence", linewidth=2)
+    ax.set_xlabel("n (time steps)")
+    ax.set_ylabel(col)
+    ax.set_title("Original vs Delayed Real Data Sequence")
+    ax.grid(True, linestyle="--", alpha=0.5)
+    ax.legend()
+    return fig
+
+# Skip redrawing when this session's plot inputs are unchanged; the PNG is a
+# snapshot, so later redraws of the reused Figure can't change what is shown
+def _show_fig(sig, build):
+    if st.session_state.get("_last_sig") != sig:
+        buf = io.BytesIO()
+        build().savefig(buf, format="png", dpi=200, bbox_inches="tight")
+        st.session_state["_last_sig"] = sig
+        st.session_state["_last_png"] = buf.getvalue()
+    st.image(st.session_state["_last_png"])
 
 # -------------------------
-# Regular Delivery Model
+# Model sections (fragments: widget changes rerun only the section)
 # -------------------------
-elif choice == "Regular Delivery Model":
-    st.header("Model 1: Regular (Periodic) Delivery Scheduling")
-
+@st.fragment
+def _regular_section():
     N = st.slider("Select number of time steps (N)", 10, 100, 30)
     pattern = st.selectbox("Select pattern type", ["Constant (x[n]=1)", "Pulse / Periodic (1,0,0,...)"])
 
-    n, x = build_sequence(N, pattern)
-
     if pattern == "Constant (x[n]=1)":
         st.write("Discrete-time sequence: x[n] = 1 (constant delivery each time step)")
     else:
         st.write("Discrete-time sequence: Pulse/Periodic (delivery occurs at some time steps)")
 
-    fig, ax = plt.subplots(figsize=(10, 4))
-    ax.step(n, x, where="mid", label="x[n] (Original)", linewidth=2)
-    ax.scatter(n, x)
-    ax.set_xlabel("n (time steps)")
-    ax.set_ylabel("Deliveries")
-    ax.set_title("Regular Delivery Sequence")
-    ax.set_ylim(-0.2, 1.2)
-    ax.grid(True, linestyle="--", alpha=0.5)
-    ax.legend()
-    st.pyplot(fig)
+    if USE_MPL:
+        _show_fig((choice, N, pattern), lambda: _make_regular_fig(N, pattern))
+    else:
+        import pandas as pd
+
+        n, x = build_sequence(N, pattern)
+        st.bar_chart(pd.DataFrame({"x[n]": x}, index=n))
 
     st.latex(r"X(z) = \sum_{n=0}^{\infty} x[n] z^{-n}")
     st.write("Interpretation: This shows the planned (on-time) delivery schedule.")
 
-# -------------------------
-# Delayed Delivery Model
-# -------------------------
-elif choice == "Delayed Delivery Model":
-    st.header("Model 2: Delayed Delivery Scheduling")
-
+@st.fragment
+def _delayed_section():
     N = st.slider("Select number of time steps (N)", 10, 100, 30)
     k = st.slider("Select delay k", 0, 20, 3)
     pattern = st.selectbox("Select pattern type", ["Constant (x[n]=1)", "Pulse / Periodic (1,0,0,...)"])
 
-    n, x = build_sequence(N, pattern)
-
-    # Build delayed sequence y[n] = x[n-k]
-    y = np.zeros(N)
-    if k < N:
-        y[k:] = x[:N-k]
-
     st.write(f"Delayed sequence: y[n] = x[n - {k}]")
 
-    fig, ax = plt.subplots(figsize=(10, 4))
-    ax.step(n, x, where="mid", label="x[n] (Original)", linewidth=2)
-    ax.scatter(n, x)
-
-    ax.step(n, y, where="mid", label="y[n] (Delayed)", linewidth=2)
-    ax.scatter(n, y)
+    if USE_MPL:
+        _show_fig((choice, N, pattern, k), lambda: _make_delayed_fig(N, pattern, k))
+    else:
+        import pandas as pd
 
-    ax.set_xlabel("n (time steps)")
-    ax.set_ylabel("Deliveries")
-    ax.set_title("Original vs Delayed Delivery Sequence")
-    ax.set_ylim(-0.2, 1.2)
-    ax.grid(True, linestyle="--", alpha=0.5)
-    ax.legend()
-    st.pyplot(fig)
+        n, x, y = _delayed_sequence(N, pattern, k)
+        st.line_chart(pd.DataFrame({"x[n]": x, "y[n]": y}, index=n))
 
     st.latex(r"Y(z) = z^{-k} X(z)")
     st.write("Interpretation: Delay shifts the schedule in time by k steps without changing its shape.")
 
-# -------------------------
-# Real Data Demo
-# -------------------------
-elif choice == "Real Data Demo":
-    st.header("Real Data Demonstration")
-
+@st.fragment
+def _real_data_section():
     uploaded_file = st.file_uploader("Upload your CSV dataset", type=["csv"])
 
     if uploaded_file is not None:
-        df = pd.read_csv(uploaded_file)
+        df = _parse_csv(uploaded_file.file_id, uploaded_file, max_rows=_MAX_ROWS)
         st.write("Dataset Preview:")
         st.dataframe(df.head())
 
@@ -122,27 +203,46 @@ elif choice == "Real Data Demo":
             col = st.selectbox("Select a numeric column as sequence", numeric_cols)
             k = st.slider("Select delay k", 0, 50, 5)
 
-            data = df[col].values
-            N = min(len(data), 200)
-            x = data[:N]
+            if USE_MPL:
+                _show_fig((choice, uploaded_file.file_id, col, k), lambda: _make_real_fig(df, col, k))
+            else:
+                import pandas as pd
 
-            y = np.zeros(N)
-            if k < N:
-                y[k:] = x[:N-k]
+                n, x, y = _real_sequence(df, col, k)
+                st.line_chart(pd.DataFrame({"Original Sequence": x, "Delayed Sequence": y}, index=n))
 
-            n = np.arange(N)
+            st.write("This shows how real delivery-related data behaves under delay.")
 
-            fig, ax = plt.subplots(figsize=(10, 4))
-            ax.plot(n, x, label="Original Sequence", linewidth=2)
-            ax.plot(n, y, label="Delayed Sequence", linewidth=2)
-            ax.set_xlabel("n (time steps)")
-            ax.set_ylabel(col)
-            ax.set_title("Original vs Delayed Real Data Sequence")
-            ax.grid(True, linestyle="--", alpha=0.5)
-            ax.legend()
-            st.pyplot(fig)
+# -------------------------
+# Introduction
+# -------------------------
+if choice == "Introduction":
+    st.header("Introduction")
+    st.write("""
+    This app models delivery schedules as discrete-time sequences and shows how delays affect them.
+    You can view a regular (on-time) schedule and a delayed schedule, and visualize the effect of delay.
+    """)
 
-            st.write("This shows how real delivery-related data behaves under delay.")
+# -------------------------
+# Regular Delivery Model
+# -------------------------
+elif choice == "Regular Delivery Model":
+    st.header("Model 1: Regular (Periodic) Delivery Scheduling")
+    _regular_section()
+
+# -------------------------
+# Delayed Delivery Model
+# -------------------------
+elif choice == "Delayed Delivery Model":
+    st.header("Model 2: Delayed Delivery Scheduling")
+    _delayed_section()
+
+# -------------------------
+# Real Data Demo
+# -------------------------
+elif choice == "Real Data Demo":
+    st.header("Real Data Demonstration")
+    _real_data_section()
 
 # -------------------------
 # Footer